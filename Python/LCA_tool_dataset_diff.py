@@ -0,0 +1,263 @@
+#Dataset-Versionsvergleich - compares two versions of an EPD dataset (Oekobaudat, EPiC, Boverket, ...)
+#entry by entry and re-evaluates only the archived project rows that depend on a changed EPD.
+#
+#usage:
+#	python LCA_tool_dataset_diff.py <old dataset> <new dataset> <dependency index> <row csv> <project csv>
+#
+#<old dataset>/<new dataset> are either a single BHoM dataset json or a folder of them (e.g. DataSets/LifeCycleAssessment/Oekobaudat).
+#<dependency index> is a json built with build_dependency_index/save_dependency_index from the archived projects:
+#	{"projects": {"<project id>": [{"element": "<row id>", "epd": "<epd key>", "quantity": 12.5}, ...]},
+#	 "epds": {"<epd key>": [["<project id>", <row number>], ...]}}
+#<row csv> gets the delta per project row, metric and module, <project csv> the summed delta per project, metric and module.
+
+import csv
+import hashlib
+import json
+import os
+import sys
+from collections import defaultdict
+
+metric_skip_keys = ('_t', 'BHoM_Guid', 'Name')		#keys of a metric which are not module values
+manual_review = ('removed', 'quantitytype', 'ambiguous')		#rows which have to be re-assigned by hand, never summed
+
+
+def epd_qualifier(epd, quantity_type=True):
+	#Type, AdditionalEPDData Id/Description and optionally QuantityType - tells apart epds sharing a name, independent of their position in the file
+	additional = next((f for f in epd.get('Fragments', []) if f.get('_t', '').endswith('AdditionalEPDData')), {})
+	fields = (epd.get('QuantityType') if quantity_type else '', epd.get('Type'), additional.get('Id'), additional.get('Description'))
+	text = '|'.join(str(v or '') for v in fields)
+	return hashlib.md5(text.encode('utf-8')).hexdigest()[:8]
+
+
+def epd_key(dataset_name, epd_name, qualifier=None):
+	#epds are identified by dataset and name - guids are regenerated between dataset releases
+	key = dataset_name + '/' + epd_name
+	if qualifier:
+		key += ' [' + qualifier + ']'		#only for names with more than one distinct epd in the dataset
+	return key
+
+
+def epd_content(epd):
+	return json.dumps([epd['QuantityType'], epd['Metrics']], sort_keys=True)
+
+
+def load_dataset(path):
+	#returns {epd key: {'Group': dataset/name, 'QuantityType': str, 'Metrics': {metric: {module: value}}, 'Qualifier': str, 'Loose': str,
+	#'Ambiguous': bool, 'Variants': sorted contents}} for a dataset json or a folder of dataset jsons
+	#identical duplicates are collapsed into one entry, a name with a single distinct epd keeps the plain key
+	#different epds which still share name and qualifier are kept once with 'Ambiguous': True and all their contents in 'Variants'
+	if os.path.isdir(path):
+		files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith('.json'))
+	else:
+		files = [path]
+
+	epds = dict()
+	for file_path in files:
+		with open(file_path, encoding='utf-8') as dataset_file:
+			dataset = json.load(dataset_file)
+		dataset_name = dataset.get('Name') or os.path.splitext(os.path.basename(file_path))[0]
+		groups = defaultdict(dict)		#name -> {content: entry}
+		for epd in dataset.get('Data', []):
+			metrics = dict()
+			for metric in epd.get('EnvironmentalMetrics', []):
+				metric_type = metric['_t'].split('.')[-1]
+				metrics[metric_type] = {module: value for module, value in metric.items() if module not in metric_skip_keys}
+			entry = {'Group': epd_key(dataset_name, epd.get('Name', '')), 'QuantityType': epd.get('QuantityType'), 'Metrics': metrics,
+				'Qualifier': epd_qualifier(epd), 'Loose': epd_qualifier(epd, quantity_type=False), 'Ambiguous': False}
+			groups[epd.get('Name', '')].setdefault(epd_content(entry), entry)
+
+		for name, entries in groups.items():
+			entries = list(entries.values())
+			for entry in entries:
+				key = epd_key(dataset_name, name, entry['Qualifier'] if len(entries) > 1 else None)
+				entry['Variants'] = [epd_content(entry)]
+				if key in epds:
+					epds[key]['Ambiguous'] = True
+					epds[key]['Variants'] = sorted(epds[key]['Variants'] + entry['Variants'])
+					continue
+				epds[key] = entry
+	return epds
+
+
+def same_value(a, b, tolerance):
+	if a is None or b is None:
+		return a is None and b is None
+	return abs(a - b) <= tolerance*max(abs(a), abs(b))		#relative only, metrics range from 1e-12 to 1e+9 per unit
+
+
+def pair_group(old_keys, new_keys, old_epds, new_epds):
+	#pairs the epds of one name in both versions - returns (pairs, unpaired old keys, unpaired new keys)
+	#1. same qualifier, 2. same qualifier without QuantityType (unit changed), 3. the only epd left on both sides
+	old_keys = list(old_keys)
+	new_keys = list(new_keys)
+	pairs = []
+	for field in ('Qualifier', 'Loose'):
+		for old_key in list(old_keys):
+			value = old_epds[old_key][field]
+			old_match = [k for k in old_keys if old_epds[k][field] == value]
+			new_match = [k for k in new_keys if new_epds[k][field] == value]
+			if len(old_match) == 1 and len(new_match) == 1:
+				pairs.append((old_key, new_match[0]))
+				old_keys.remove(old_key)
+				new_keys.remove(new_match[0])
+	if len(old_keys) == 1 and len(new_keys) == 1:
+		pairs.append((old_keys.pop(), new_keys.pop()))
+	return pairs, old_keys, new_keys
+
+
+def diff_datasets(old_epds, new_epds, tolerance=1e-9):
+	#returns {old epd key: {'Status': 'removed'|'changed'|'ambiguous', 'Modules': sorted list of (metric, module), 'NewKey': paired key}}
+	#and {new epd key: {'Status': 'added', ...}} for every epd that differs
+	#epds are paired within their name, so adding a second epd of the same name keeps the first one paired with its plain key
+	#'ambiguous' - the epds under the key cannot be told apart and differ between the versions, or cannot be paired at all
+	old_groups = defaultdict(list)
+	new_groups = defaultdict(list)
+	for key, epd in old_epds.items():
+		old_groups[epd['Group']].append(key)
+	for key, epd in new_epds.items():
+		new_groups[epd['Group']].append(key)
+
+	changes = dict()
+	for group in old_groups.keys() | new_groups.keys():
+		pairs, old_left, new_left = pair_group(sorted(old_groups.get(group, [])), sorted(new_groups.get(group, [])), old_epds, new_epds)
+		for key in old_left:
+			status = 'ambiguous' if new_left else 'removed'
+			changes[key] = {'Status': status, 'Modules': sorted((m, mod) for m, values in old_epds[key]['Metrics'].items() for mod in values), 'NewKey': None}
+		if not old_left:
+			for key in new_left:
+				changes[key] = {'Status': 'added', 'Modules': sorted((m, mod) for m, values in new_epds[key]['Metrics'].items() for mod in values), 'NewKey': key}
+
+		for key, new_key in pairs:
+			old_epd = old_epds[key]
+			new_epd = new_epds[new_key]
+			if old_epd['Ambiguous'] or new_epd['Ambiguous']:
+				if old_epd['Variants'] != new_epd['Variants']:
+					changes[key] = {'Status': 'ambiguous', 'Modules': [], 'NewKey': new_key}
+				continue
+			modules = set()
+			if old_epd['QuantityType'] != new_epd['QuantityType']:
+				modules.add(('QuantityType', ''))		#results are not comparable anymore, reported but not re-evaluated numerically
+			for metric in old_epd['Metrics'].keys() | new_epd['Metrics'].keys():
+				old_values = old_epd['Metrics'].get(metric, {})
+				new_values = new_epd['Metrics'].get(metric, {})
+				for module in old_values.keys() | new_values.keys():
+					if not same_value(old_values.get(module), new_values.get(module), tolerance):
+						modules.add((metric, module))
+			if modules:
+				changes[key] = {'Status': 'changed', 'Modules': sorted(modules), 'NewKey': new_key}
+	return changes
+
+
+def build_dependency_index(projects):
+	#projects - {project id: [{'element': row id, 'epd': epd key, 'quantity': float}, ...]}
+	#returns the stored index with the inverted epd -> (project, row) lookup
+	epds = defaultdict(list)
+	for project_id, rows in projects.items():
+		for row_number, row in enumerate(rows):
+			epds[row['epd']].append([project_id, row_number])
+	return {'projects': projects, 'epds': dict(epds)}
+
+
+def save_dependency_index(index, path):
+	with open(path, 'w', encoding='utf-8') as index_file:
+		json.dump(index, index_file)
+
+
+def load_dependency_index(path):
+	with open(path, encoding='utf-8') as index_file:
+		return json.load(index_file)
+
+
+def reevaluate(changes, old_epds, new_epds, index):
+	#re-evaluates only the project rows referencing a changed epd
+	#returns a list of delta rows (one per project row, metric and module) - unaffected rows are never touched
+	#rows of removed/ambiguous epds or epds with another QuantityType get one row with 'delta': None to be re-assigned by hand
+	deltas = []
+	for key in sorted(changes):
+		change = changes[key]
+		if change['Status'] == 'added':
+			continue		#no archived project can reference a new epd
+		for project_id, row_number in index['epds'].get(key, []):
+			row = index['projects'][project_id][row_number]
+			quantity = row['quantity']
+			if change['Status'] in ('removed', 'ambiguous'):
+				deltas.append({'project': project_id, 'element': row['element'], 'epd': key, 'metric': '', 'module': '',
+					'old': None, 'new': None, 'delta': None, 'status': change['Status']})
+				continue
+			if ('QuantityType', '') in change['Modules']:
+				#quantities refer to another unit now - the row has to be re-taken off, no numeric delta
+				deltas.append({'project': project_id, 'element': row['element'], 'epd': key, 'metric': 'QuantityType', 'module': '',
+					'old': old_epds[key]['QuantityType'], 'new': new_epds[change['NewKey']]['QuantityType'], 'delta': None, 'status': 'quantitytype'})
+				continue
+			for metric, module in change['Modules']:
+				old_value = old_epds[key]['Metrics'].get(metric, {}).get(module)
+				new_value = new_epds[change['NewKey']]['Metrics'].get(metric, {}).get(module)
+				old_result = quantity*old_value if old_value is not None else 0
+				new_result = quantity*new_value if new_value is not None else 0
+				deltas.append({'project': project_id, 'element': row['element'], 'epd': key, 'metric': metric, 'module': module,
+					'old': old_result, 'new': new_result, 'delta': new_result - old_result, 'status': change['Status']})
+	return deltas
+
+
+def project_deltas(deltas):
+	#sums the numeric row deltas to {project id: {(metric, module): delta}} - rows for manual review are not part of the totals
+	totals = defaultdict(lambda: defaultdict(float))
+	for delta in deltas:
+		if delta['status'] not in manual_review:
+			totals[delta['project']][(delta['metric'], delta['module'])] += delta['delta']
+	return {project_id: dict(values) for project_id, values in totals.items()}
+
+
+def csv_value(value):
+	#full precision with decimal comma - small metrics (e.g. 5e-08 per unit) must not be rounded away
+	if isinstance(value, float):
+		return repr(value).replace('.', ',')
+	return value
+
+
+def write_deltas(deltas, path):
+	#same csv layout as LCA_tool_part_tostart.py (semicolon separated, decimal comma)
+	fieldnames = ['project', 'element', 'epd', 'metric', 'module', 'old', 'new', 'delta', 'status']
+	with open(path, 'w', encoding='utf-8') as export_file:
+		file = csv.DictWriter(export_file, fieldnames, delimiter=';', quotechar='"', lineterminator='\n', quoting=csv.QUOTE_ALL)
+		file.writeheader()
+		for delta in deltas:
+			file.writerow({n: csv_value(v) for n, v in delta.items()})
+
+
+def write_project_deltas(deltas, path):
+	#per project totals plus the number of rows left for manual review
+	review = defaultdict(int)
+	for delta in deltas:
+		if delta['status'] in manual_review:
+			review[delta['project']] += 1
+	totals = project_deltas(deltas)
+
+	fieldnames = ['project', 'metric', 'module', 'delta', 'manual review rows']
+	with open(path, 'w', encoding='utf-8') as export_file:
+		file = csv.DictWriter(export_file, fieldnames, delimiter=';', quotechar='"', lineterminator='\n', quoting=csv.QUOTE_ALL)
+		file.writeheader()
+		for project_id in sorted(totals.keys() | review.keys()):
+			values = totals.get(project_id, {})
+			if not values:
+				file.writerow({'project': project_id, 'metric': '', 'module': '', 'delta': '', 'manual review rows': review[project_id]})
+			for (metric, module), value in sorted(values.items()):
+				file.writerow({'project': project_id, 'metric': metric, 'module': module, 'delta': csv_value(value), 'manual review rows': review[project_id]})
+
+
+if __name__ == '__main__':
+	if len(sys.argv) != 6:
+		print('usage: python LCA_tool_dataset_diff.py <old dataset> <new dataset> <dependency index> <row csv> <project csv>')
+		sys.exit(1)
+
+	old_epds = load_dataset(sys.argv[1])
+	new_epds = load_dataset(sys.argv[2])
+	changes = diff_datasets(old_epds, new_epds)
+	for status in ('added', 'removed', 'changed', 'ambiguous'):
+		print(status, '= ', sum(1 for c in changes.values() if c['Status'] == status))
+
+	index = load_dependency_index(sys.argv[3])
+	deltas = reevaluate(changes, old_epds, new_epds, index)
+	print('manual review rows = ', sum(1 for d in deltas if d['status'] in manual_review))
+	write_deltas(deltas, sys.argv[4])
+	write_project_deltas(deltas, sys.argv[5])
@@ -19,6 +19,8 @@ q2_input = 0.1
 n2_input = 'Nein'
 s2_input = 'Gas BHKW (KWKK)'
 v2_input = 'Second-Life Lithium'
+zeithorizont_input = 'Nein'		#'Ja' - whole-life mode (B4/B6, Barwert), needs numpy
+betrachtungszeitraum_input = 50		#betrachtungszeitraum (a)
 c5_2ndlayer = 188.288		#compute
 c6_2ndlayer = 156.9066667	#compute
 c18_2ndlayer = 'Ja'
@@ -688,9 +690,79 @@ graue_thg_em_gesamt = graue_thg_em_kg200 + graue_thg_em_kg400 + graue_thg_em_win
 print('graue_thg_em_gesamt = ', graue_thg_em_gesamt)
 
 
+#Zeithorizont - Betrieb (B6), Ersatz (B4) und Lebenszykluskosten [€] - Barwert
+
+if zeithorizont_input == 'Ja':
+	from LCA_tool_whole_life import time_horizon, nutzungsdauer
+
+	luft_th = 40		#warmepumpe luft Th
+	luft_tc = 0			#warmepumpe luft Tc
+	luft_cop = 0.5*(luft_th + kelvin)/((luft_th + kelvin) - (luft_tc + kelvin))		#luft_cop - warmepumpe luft COPreal
+	if c23_2ndlayer_input == 'Luftwaermepumpe' and p44_syst - n47_syst > 0:
+		luft_warme = p44_syst - n47_syst		#luft_warme - warmepumpe luft (MWh/a)
+	else:
+		luft_warme = 0
+	bhkw_eta_th = 0.55		#BHKW thermischer wirkungsgrad
+	bhkw_eta_el = 0.35		#BHKW elektrischer wirkungsgrad
+	kessel_eta = 0.95		#spitzenlastkessel wirkungsgrad
+	gas_bhkw = p30_syst*d25_syst/bhkw_eta_th		#gas_bhkw - BHKW gasbedarf, d25_syst - BHKW anteil an p30_syst (MWh/a)
+	gas_kessel = p30_syst*(1 - d25_syst)/kessel_eta		#gas_kessel - spitzenlastkessel gasbedarf (MWh/a)
+	gas_betrieb = gas_bhkw + gas_kessel		#gas_betrieb - gasbedarf (MWh/a)
+	strom_dezentral = ae48_syst + ae57_syst + ae66_syst		#warmepumpen dezentral (strombedarf MWh/a)
+	strom_zentral = (l71_syst - g71_syst) + (l51_syst - g51_syst) + luft_warme/luft_cop		#warmepumpen geothermie, abwasser, luft (strombedarf MWh/a)
+	strom_bedarf = strom_dezentral + strom_zentral		#strom_bedarf - strombedarf warmepumpen (MWh/a)
+
+	pv_ertrag = 950		#pv_ertrag - spezifischer PV ertrag (kWh/kWp/a)
+	wind_volllaststunden = 3500		#wind_volllaststunden - windkraft offshore (h/a)
+	strom_bhkw = gas_bhkw*bhkw_eta_el		#strom_bhkw - BHKW strom (MWh/a)
+	strom_pv = c9_solar*pv_ertrag/1000		#strom_pv - PV strom, c9_solar - leistung solar (MWh/a)
+	strom_wind = c22_2ndlayer*wind_volllaststunden		#strom_wind - windkraft strom, c22_2ndlayer - leistung windkraft in MW (MWh/a)
+	strom_erzeugung = strom_bhkw + strom_pv + strom_wind		#strom_erzeugung - eigene stromerzeugung, jahresbilanz (MWh/a)
+
+	#komponenten - einzelne kostenpositionen mit ihren grauen emissionen, nutzungsdauer aus LCA_tool_whole_life (None - einmalig, kein ersatz)
+	komponenten = {
+		'Heizzentrale': (j8_ke, s8_ke),
+		'EMSR': (j9_ke, s9_ke),
+		'Pufferspeicher': (j10_ke, s10_ke),
+		'HA-Stationen': (j11_ke, 0),
+		'Netzwerk Trasse': (j13_ke + j14_ke + j15_ke, s12_ke),		#DN100, DN150, DN300
+		'Kernbohrungen': (j16_ke, 0),
+		'Forderung KWKG': (j17_ke, 0),
+		'BHKW': (j20_ke, s20_ke),
+		'Abwasserwaerme': (j22_ke, s22_ke),
+		'Forderung Abwasserwaerme': (j24_ke, 0),
+		'Solarthermie': (j27_ke, s27_ke),
+		'Geothermie': (j30_ke, s30_ke),
+		'Waermepumpe zentral': (j31_ke, s31_ke),
+		'Waermepumpen dezentral': (j34_ke, s34_ke),
+		'Gebaeude TGA': (j35_ke, s35_ke),
+		'Anschluss Stromnetz': (j38_ke, 0),
+		'Windkraft': (inv_windkraft, graue_thg_em_wind),
+		'PV': (inv_pv, graue_thg_em_pv),
+		'Batterie': (inv_batterie, graue_thg_em_bat),
+		'Nahwaermespeicher': (inv_nahwarmespeicher, graue_thg_em_nahw),
+	}
+	komponenten = {n: (kosten, emissionen, nutzungsdauer[n]) for n, (kosten, emissionen) in komponenten.items()}
+	zeithorizont = time_horizon(strom_bedarf, gas_betrieb, komponenten, erzeugung_mwh=strom_erzeugung, betrachtungszeitraum=betrachtungszeitraum_input)
+	thg_em_b6 = float(zeithorizont['b6_thg_gesamt'][0])
+	thg_em_b4 = float(zeithorizont['b4_thg_gesamt'][0])
+	thg_em_lebenszyklus = float(zeithorizont['thg_lebenszyklus'][0])
+	lebenszykluskosten_npv = float(zeithorizont['npv'][0])
+	strom_export = float(zeithorizont['export_mwh'][0])
+	thg_em_modul_d = float(zeithorizont['modul_d_thg_gesamt'][0])
+	print('strom_export = ', strom_export)
+	print('thg_em_b6 = ', thg_em_b6)
+	print('thg_em_b4 = ', thg_em_b4)
+	print('thg_em_modul_d = ', thg_em_modul_d)
+	print('thg_em_lebenszyklus = ', thg_em_lebenszyklus)
+	print('lebenszykluskosten_npv = ', lebenszykluskosten_npv)
+
+
 #create result csv
 
 fieldnames = ['id','Investitionskosten - KG200', 'Investitionskosten - KG400-Technik', 'Investitionskosten - Windkraft', 'Investitionskosten - PV', 'Investitionskosten - Batterie', 'Investitionskosten - Nahwaermespeicher', 'Investitionskosten - Gesamt','Graue THG Emissionen - KG200', 'Graue Emissionen - KG400-Technik','Graue THG Emissionen - Windkraft','Graue THG Emissionen - PV','Graue THG Emissionen - Batterie','Graue THG Emissionen - Nahwaermespeicher','Graue THG Emissionen - Gesamt']
+if zeithorizont_input == 'Ja':
+	fieldnames += ['THG Emissionen - Betrieb (B6)', 'THG Emissionen - Ersatz (B4)', 'THG Emissionen - Lebenszyklus', 'Lebenszykluskosten - Barwert', 'Strom Export', 'THG Gutschrift Export (Modul D)']
 
 export_file = open('C:/Users/eusmanova/Downloads/LCA_tool_result.csv', 'w')
 file = csv.DictWriter(export_file, fieldnames, delimiter=';',quotechar='"', lineterminator = '\n', quoting=csv.QUOTE_ALL)
@@ -718,6 +790,13 @@ row['Graue THG Emissionen - PV'] = str(round(graue_thg_em_pv,3)).replace('.', ',
 row['Graue THG Emissionen - Batterie'] = str(round(graue_thg_em_bat,3)).replace('.', ',')
 row['Graue THG Emissionen - Nahwaermespeicher'] = str(round(graue_thg_em_nahw,3)).replace('.', ',')
 row['Graue THG Emissionen - Gesamt'] = str(round(graue_thg_em_gesamt,3)).replace('.', ',')
+if zeithorizont_input == 'Ja':
+	row['THG Emissionen - Betrieb (B6)'] = str(round(thg_em_b6,3)).replace('.', ',')
+	row['THG Emissionen - Ersatz (B4)'] = str(round(thg_em_b4,3)).replace('.', ',')
+	row['THG Emissionen - Lebenszyklus'] = str(round(thg_em_lebenszyklus,3)).replace('.', ',')
+	row['Lebenszykluskosten - Barwert'] = str(round(lebenszykluskosten_npv,3)).replace('.', ',')
+	row['Strom Export'] = str(round(strom_export,3)).replace('.', ',')
+	row['THG Gutschrift Export (Modul D)'] = str(round(thg_em_modul_d,3)).replace('.', ',')
 file.writerow(row)
 export_file.close()
 
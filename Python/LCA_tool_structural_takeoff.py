@@ -0,0 +1,83 @@
+#Batch material takeoff for structural models - array versions of Compute.ConcreteVolume,
+#Compute.ReinforcementVolume and Compute.GlazingVolume (LifeCycleAssessment_Engine) plus the
+#EC3 concrete strength band lookup. Every input is one value per element (or a scalar for all elements).
+
+import os
+import re
+
+import numpy as np
+
+ec3_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DataSets', 'LifeCycleAssessment', 'EC3')
+ec3_concrete_pattern = re.compile(r'^BuroHappold_EC3_Concrete_(NW|LW)_(\d+)-(\d+)\.json$')		#strength band in psi
+gewichtsklassen = ('NW', 'LW')		#normal weight, light weight
+mpa_to_psi = 145.0377
+strength_units = {'psi': 1.0, 'MPa': mpa_to_psi, 'Pa': mpa_to_psi*1e-6}		#BHoM structural Concrete stores the strength in Pa
+
+
+def reinforcement_volume(concrete_volume, percentage_reinforcement):
+	#percentage_reinforcement - number between 0 and 100, same as Compute.ReinforcementVolume
+	return np.asarray(concrete_volume, dtype=float)*(np.asarray(percentage_reinforcement, dtype=float)*0.01)
+
+
+def concrete_volume(concrete_volume, reinforcement_volume):
+	#gross concrete volume less reinforcement (m3), same as Compute.ConcreteVolume
+	return np.asarray(concrete_volume, dtype=float) - np.asarray(reinforcement_volume, dtype=float)
+
+
+def glazing_volume(glazing_area, glazing_thickness, number_of_panes):
+	#same as Compute.GlazingVolume
+	return np.asarray(glazing_area, dtype=float)*np.asarray(glazing_thickness, dtype=float)*np.asarray(number_of_panes, dtype=float)
+
+
+def build_band_index(folder=ec3_folder):
+	#precomputed interval index over all EC3 concrete band files
+	#bands of all weight classes are concatenated and sorted by (weight class, upper bound), so one searchsorted resolves any element
+	bands = []
+	for file_name in os.listdir(folder):
+		match = ec3_concrete_pattern.match(file_name)
+		if match:
+			bands.append((gewichtsklassen.index(match.group(1)), int(match.group(2)), int(match.group(3)), file_name))
+	if not bands:
+		raise ValueError('No EC3 concrete band files (BuroHappold_EC3_Concrete_<NW|LW>_<von>-<bis>.json) found in ' + os.path.abspath(folder))
+	bands.sort()
+
+	offset = 10*max(band[2] for band in bands)		#keeps the weight classes apart on one axis
+	return {
+		'offset': offset,
+		'klasse': np.array([band[0] for band in bands]),
+		'von': np.array([band[1] for band in bands], dtype=float),
+		'bis': np.array([band[2] for band in bands], dtype=float),
+		'schlussel': np.array([band[0]*offset + band[2] for band in bands], dtype=float),
+		'dateien': [os.path.join(folder, band[3]) for band in bands],
+	}
+
+
+def lookup_band(index, strength, weight_class='NW', strength_unit='psi'):
+	#returns the band number per element (index into index['dateien']), -1 if no EC3 band covers the strength (or it is NaN)
+	#the bands are whole psi ranges (0-2500, 2501-3000, ...) - the strength is rounded up to whole psi and has to lie within von-bis,
+	#the same rule for every weight class: 2500.5 psi -> NW_2501-3000 and LW_2501-3000, 2500 psi -> NW_0-2500 and no LW band
+	strength_psi = np.asarray(strength, dtype=float)*strength_units[strength_unit]
+	strength_psi = np.ceil(strength_psi - 1e-6)		#tolerance for unit conversion noise on the band bounds
+	weight_class = np.asarray(weight_class)
+	klasse = np.select([weight_class == k for k in gewichtsklassen], range(len(gewichtsklassen)), -1)		#-1 - unknown weight class
+	strength_psi, klasse = np.broadcast_arrays(strength_psi, klasse)
+
+	band = np.searchsorted(index['schlussel'], klasse*index['offset'] + strength_psi, side='left')
+	band_clipped = np.minimum(band, len(index['schlussel']) - 1)
+	gefunden = (band < len(index['schlussel'])) & (klasse >= 0) & (index['klasse'][band_clipped] == klasse) & (strength_psi >= index['von'][band_clipped])		#NaN compares False
+	return np.where(gefunden, band_clipped, -1)
+
+
+def structural_takeoff(concrete_gross_volume, percentage_reinforcement, strength, weight_class='NW', glazing_area=0, glazing_thickness=0, number_of_panes=0, strength_unit='psi', index=None):
+	#net concrete/rebar/glazing volumes (m3) and EC3 band for a whole structural model, every result has one value per element
+	if index is None:
+		index = build_band_index()
+	elemente = np.broadcast(*(np.asarray(x) for x in (concrete_gross_volume, percentage_reinforcement, strength, weight_class, glazing_area, glazing_thickness, number_of_panes))).shape
+	rebar = np.broadcast_to(reinforcement_volume(concrete_gross_volume, percentage_reinforcement), elemente)
+	return {
+		'concrete_volume': np.broadcast_to(concrete_volume(concrete_gross_volume, rebar), elemente),
+		'reinforcement_volume': rebar,
+		'glazing_volume': np.broadcast_to(glazing_volume(glazing_area, glazing_thickness, number_of_panes), elemente),
+		'ec3_band': np.broadcast_to(lookup_band(index, strength, weight_class, strength_unit), elemente),
+		'ec3_dateien': index['dateien'],
+	}
@@ -0,0 +1,122 @@
+#Zeithorizont - whole-life mode for LCA_tool_part_tostart.py
+#projects the yearly operational energy (B6), grid factor trajectories and component replacements (B4)
+#over the study period and discounts the lifecycle cost to a net present value (Barwert), less the residual value
+#of the components at the end of the study period.
+#All results are computed as one array computation over (scenarios x years), scalar inputs are one scenario.
+
+import numpy as np
+
+#Treibhausgasfaktoren [tCO2e/MWh]
+netzfaktor_pfad = {2025: 0.38, 2030: 0.25, 2045: 0.03}		#strommix Deutschland, angenommener Pfad (klimaneutral 2045), interpoliert
+gasfaktor = 0.24		#erdgas (GEG Anlage 9)
+
+#Energiepreise [€/MWh] und Finanzierung
+strompreis = 250
+gaspreis = 100
+exportpreis = 80		#einspeisevergütung für überschüssigen strom
+preissteigerung = 0.02		#jährliche Energiepreissteigerung
+zinssatz = 0.03		#Kalkulationszins
+
+#Nutzungsdauer [a] der Kostenpositionen (Annahme nach BNB Nutzungsdauern von Bauteilen), None - einmalig, wird nicht ersetzt
+nutzungsdauer = {
+	'Heizzentrale': 20,
+	'EMSR': 20,
+	'Pufferspeicher': 20,
+	'HA-Stationen': 20,
+	'Netzwerk Trasse': 40,		#erdverlegte Rohrleitungen
+	'Kernbohrungen': None,
+	'Forderung KWKG': None,		#zuschuss
+	'BHKW': 15,
+	'Abwasserwaerme': 20,
+	'Forderung Abwasserwaerme': None,		#zuschuss
+	'Solarthermie': 20,
+	'Geothermie': 50,		#erdwärmesonden
+	'Waermepumpe zentral': 20,
+	'Waermepumpen dezentral': 20,
+	'Gebaeude TGA': 25,
+	'Anschluss Stromnetz': None,		#anschlussgebühr
+	'Windkraft': 20,
+	'PV': 25,
+	'Batterie': 15,
+	'Nahwaermespeicher': 30,
+}
+
+
+def netzfaktor_jahre(jahre, pfad=None):
+	#pfad - {jahr: faktor} trajectory (linear interpolation, constant outside), an array over the years (Y,) or over (scenarios x years)
+	if pfad is None:
+		pfad = netzfaktor_pfad
+	if isinstance(pfad, dict):
+		stutzjahre = sorted(pfad)
+		return np.interp(jahre, stutzjahre, [pfad[j] for j in stutzjahre])
+	return np.asarray(pfad, dtype=float)
+
+
+def szenario_array(wert, szenarien):
+	return np.broadcast_to(np.atleast_1d(np.asarray(wert, dtype=float)), (szenarien,))
+
+
+def time_horizon(strom_mwh, gas_mwh, komponenten, erzeugung_mwh=0, betrachtungszeitraum=50, startjahr=2025, netzfaktor=None,
+		gasfaktor=gasfaktor, strompreis=strompreis, gaspreis=gaspreis, exportpreis=exportpreis, preissteigerung=preissteigerung, zinssatz=zinssatz):
+	#strom_mwh, gas_mwh - yearly operational electricity / gas demand (MWh/a)
+	#erzeugung_mwh - yearly own electricity generation (BHKW, PV, wind) in an annual balance (MWh/a)
+	#only the remaining grid import counts for B6, surplus is exported at exportpreis and its carbon credit is reported as module D
+	#komponenten - {name: (investitionskosten [€], graue emissionen [tCO2e], nutzungsdauer [a] or None for one-off items)}
+	#demands, prices, preissteigerung, zinssatz, costs and emissions are scalars or (scenarios,)
+	#returns dict of arrays, yearly values have shape (scenarios x years)
+	werte = [strom_mwh, gas_mwh, erzeugung_mwh, strompreis, gaspreis, exportpreis, preissteigerung, zinssatz]
+	werte += [w for k in komponenten.values() for w in k[:2]]
+	szenarien = np.broadcast(*(np.atleast_1d(np.asarray(w, dtype=float)) for w in werte)).shape[0]
+	strom_mwh, gas_mwh, erzeugung_mwh, strompreis, gaspreis, exportpreis, preissteigerung, zinssatz = (szenario_array(w, szenarien) for w in werte[:8])
+	netzbezug = np.maximum(strom_mwh - erzeugung_mwh, 0)		#(S,) MWh/a
+	export = np.maximum(erzeugung_mwh - strom_mwh, 0)		#(S,) MWh/a
+
+	t = np.arange(1, betrachtungszeitraum + 1)		#betriebsjahr 1..T
+	jahre = startjahr + t - 1
+	diskont = (1.0 + zinssatz[:, None])**(-t)		#(S x Y)
+
+	#Betrieb (B6) - energy demand is constant over the years, the grid factor and the prices change
+	nf = np.broadcast_to(netzfaktor_jahre(jahre, netzfaktor), (szenarien, betrachtungszeitraum))
+	b6_thg = netzbezug[:, None]*nf + gas_mwh[:, None]*gasfaktor		#(S x Y) tCO2e/a
+	modul_d_thg = -export[:, None]*nf		#(S x Y) tCO2e/a, avoided grid electricity - outside the lifecycle total
+	energiekosten = netzbezug*strompreis + gas_mwh*gaspreis - export*exportpreis		#(S,) €/a
+	betriebskosten = energiekosten[:, None]*(1.0 + preissteigerung[:, None])**(t - 1)		#(S x Y) €/a
+
+	#Ersatz (B4) - a component is replaced every nutzungsdauer years, not in the last year of the study period
+	namen = list(komponenten)
+	inv = np.zeros((szenarien, len(namen)))		#(S x C)
+	graue = np.zeros((szenarien, len(namen)))		#(S x C)
+	for n, name in enumerate(namen):
+		inv[:, n] = szenario_array(komponenten[name][0], szenarien)
+		graue[:, n] = szenario_array(komponenten[name][1], szenarien)
+	dauer = np.array([np.inf if komponenten[n][2] is None else komponenten[n][2] for n in namen], dtype=float)		#(C,)
+	ersatz = np.isfinite(dauer)[:, None] & ((t[None, :] % dauer[:, None]) == 0) & (t[None, :] < betrachtungszeitraum)		#(C x Y)
+	ersatzkosten = inv @ ersatz		#(S x Y) €
+	b4_thg = graue @ ersatz		#(S x Y) tCO2e
+
+	#Restwert - linear depreciation of the last installation at the end of the study period (EN 15459), one-off items have none
+	endlich = np.isfinite(dauer)
+	teiler = np.where(endlich, dauer, 1.0)
+	letzter_einbau = np.floor((betrachtungszeitraum - 1)/teiler)*teiler		#(C,) jahr of the last installation
+	restanteil = np.where(endlich, np.clip(1 - (betrachtungszeitraum - letzter_einbau)/teiler, 0, 1), 0)		#(C,)
+	restwert = (inv @ restanteil)*diskont[:, -1]		#(S,) € discounted
+
+	investition = inv.sum(axis=1)
+	graue_thg = graue.sum(axis=1)
+	npv = investition + ((betriebskosten + ersatzkosten)*diskont).sum(axis=1) - restwert		#Barwert der Lebenszykluskosten
+
+	return {
+		'jahre': jahre,
+		'netzbezug_mwh': netzbezug,
+		'export_mwh': export,
+		'b6_thg': b6_thg,
+		'b4_thg': b4_thg,
+		'betriebskosten': betriebskosten,
+		'ersatzkosten': ersatzkosten,
+		'restwert': restwert,
+		'b6_thg_gesamt': b6_thg.sum(axis=1),
+		'b4_thg_gesamt': b4_thg.sum(axis=1),
+		'modul_d_thg_gesamt': modul_d_thg.sum(axis=1),
+		'thg_lebenszyklus': graue_thg + b4_thg.sum(axis=1) + b6_thg.sum(axis=1),
+		'npv': npv,
+	}
@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import LCA_tool_dataset_diff as diff
+from conftest import datasets
+
+brick = os.path.join(datasets, 'Oekobaudat', 'Oekobaudat_Materials_Brick.json')
+mortar = os.path.join(datasets, 'ICE', 'InventoryOfCarbonAndEnergy_CementMortar.json')
+foam = os.path.join(datasets, 'Oekobaudat', 'Oekobaudat_Materials_Insulation_Foam.json')
+
+
+def new_version(source, tmp_path, modify):
+	target = os.path.join(str(tmp_path), os.path.basename(source))
+	with open(source, encoding='utf-8') as f:
+		dataset = json.load(f)
+	modify(dataset['Data'])
+	with open(target, 'w', encoding='utf-8') as f:
+		json.dump(dataset, f)
+	return target
+
+
+def metric(epd, name):
+	return next(m for m in epd['EnvironmentalMetrics'] if m['_t'].endswith('.' + name))
+
+
+def test_unchanged_dataset_has_no_changes(tmp_path):
+	copy = os.path.join(str(tmp_path), 'copy.json')
+	shutil.copy(brick, copy)
+	assert diff.diff_datasets(diff.load_dataset(brick), diff.load_dataset(copy)) == {}
+
+
+def test_changed_and_removed_epd(tmp_path):
+	def modify(data):
+		metric(data[0], 'ClimateChangeTotalMetric')['A1toA3'] *= 1.1
+		del data[2]
+	old_epds = diff.load_dataset(brick)
+	new_epds = diff.load_dataset(new_version(brick, tmp_path, modify))
+	changes = diff.diff_datasets(old_epds, new_epds)
+
+	changed = 'Oekobaudat_Materials_Brick/Dachziegel Neufahrn'
+	removed = 'Oekobaudat_Materials_Brick/Vormauerziegel, Pflasterziegel und Riemchen'
+	assert changes[changed]['Status'] == 'changed'
+	assert changes[changed]['Modules'] == [('ClimateChangeTotalMetric', 'A1toA3')]
+	assert changes[removed]['Status'] == 'removed'
+	assert len(changes) == 2
+
+	index = diff.build_dependency_index({
+		'P1': [{'element': 'w1', 'epd': changed, 'quantity': 1000.0}, {'element': 'w2', 'epd': removed, 'quantity': 5000.0}],
+		'P2': [{'element': 'w3', 'epd': 'Oekobaudat_Materials_Brick/Mauerziegel', 'quantity': 10.0}],
+	})
+	deltas = diff.reevaluate(changes, old_epds, new_epds, index)
+	assert len(deltas) == 2		#P2 references an unchanged epd and is never re-evaluated
+	assert [d for d in deltas if d['element'] == 'w2'][0]['delta'] is None
+
+	totals = diff.project_deltas(deltas)
+	old_value = old_epds[changed]['Metrics']['ClimateChangeTotalMetric']['A1toA3']
+	assert totals == {'P1': {('ClimateChangeTotalMetric', 'A1toA3'): pytest.approx(1000*old_value*0.1)}}
+
+
+def test_reordered_duplicates_keep_their_key(tmp_path):
+	old_epds = diff.load_dataset(mortar)
+	new_epds = diff.load_dataset(new_version(mortar, tmp_path, lambda data: data.reverse()))
+	assert sum(1 for key in old_epds if key.startswith('InventoryOfCarbonAndEnergy_CementMortar/Mortar (1:4) [')) == 2
+	assert diff.diff_datasets(old_epds, new_epds) == {}
+
+
+def test_identical_duplicates_are_collapsed(tmp_path):
+	old_epds = diff.load_dataset(foam)
+	assert diff.diff_datasets(old_epds, diff.load_dataset(new_version(foam, tmp_path, lambda data: None))) == {}
+
+
+def test_changed_indistinguishable_duplicates_are_ambiguous(tmp_path):
+	name = 'PE - Schaum ummantelte Kupfer-Hausinstallationsrohre'
+	def modify(data):
+		epd = [epd for epd in data if epd['Name'] == name][1]
+		metric(epd, 'ClimateChangeTotalMetric')['A1toA3'] *= 1.1
+	old_epds = diff.load_dataset(foam)
+	new_epds = diff.load_dataset(new_version(foam, tmp_path, modify))
+	key = 'Oekobaudat_Materials_Insulation_Foam/' + name
+	assert key in old_epds		#identical in the original, collapsed to the plain key
+	changes = diff.diff_datasets(old_epds, new_epds)
+	assert list(changes) == [key] and changes[key]['Status'] == 'ambiguous'
+
+	deltas = diff.reevaluate(changes, old_epds, new_epds, diff.build_dependency_index({'P1': [{'element': 'r1', 'epd': key, 'quantity': 1.0}]}))
+	assert deltas[0]['status'] == 'ambiguous' and deltas[0]['delta'] is None
+	assert diff.project_deltas(deltas) == {}
+
+
+def test_added_duplicate_name_keeps_the_original_paired(tmp_path):
+	def modify(data):
+		epd = json.loads(json.dumps([epd for epd in data if epd['Name'] == 'Mauerziegel'][0]))
+		epd['QuantityType'] = 'Mass'
+		data.append(epd)
+	old_epds = diff.load_dataset(brick)
+	new_epds = diff.load_dataset(new_version(brick, tmp_path, modify))
+	changes = diff.diff_datasets(old_epds, new_epds)
+	assert 'Oekobaudat_Materials_Brick/Mauerziegel' in old_epds
+	assert [c['Status'] for c in changes.values()] == ['added']
+	assert list(changes)[0].startswith('Oekobaudat_Materials_Brick/Mauerziegel [')
+
+
+def test_quantity_type_change_of_duplicate_name(tmp_path):
+	def modify(data):
+		[epd for epd in data if epd['Name'] == 'Dachziegel' and epd['QuantityType'] == 'Area'][0]['QuantityType'] = 'Volume'
+	old_epds = diff.load_dataset(brick)
+	new_epds = diff.load_dataset(new_version(brick, tmp_path, modify))
+	changes = diff.diff_datasets(old_epds, new_epds)
+	assert len(changes) == 1
+	key, change = next(iter(changes.items()))
+	assert key.startswith('Oekobaudat_Materials_Brick/Dachziegel [')
+	assert change['Modules'] == [('QuantityType', '')]
+
+
+def test_quantity_type_change_is_not_summed(tmp_path):
+	def modify(data):
+		data[0]['QuantityType'] = 'Volume'
+	old_epds = diff.load_dataset(brick)
+	new_epds = diff.load_dataset(new_version(brick, tmp_path, modify))
+	changes = diff.diff_datasets(old_epds, new_epds)
+	key = 'Oekobaudat_Materials_Brick/Dachziegel Neufahrn'
+	deltas = diff.reevaluate(changes, old_epds, new_epds, diff.build_dependency_index({'P1': [{'element': 'r1', 'epd': key, 'quantity': 1.0}]}))
+	assert [d['status'] for d in deltas] == ['quantitytype']
+	assert diff.project_deltas(deltas) == {}
+
+
+def test_small_deltas_are_written_with_full_precision(tmp_path):
+	def modify(data):
+		metric(data[0], 'AbioticDepletionMineralsAndMetalsMetric')['A1toA3'] *= 1.1
+	old_epds = diff.load_dataset(brick)
+	new_epds = diff.load_dataset(new_version(brick, tmp_path, modify))
+	changes = diff.diff_datasets(old_epds, new_epds)
+	key = 'Oekobaudat_Materials_Brick/Dachziegel Neufahrn'
+	assert changes[key]['Modules'] == [('AbioticDepletionMineralsAndMetalsMetric', 'A1toA3')]
+
+	deltas = diff.reevaluate(changes, old_epds, new_epds, diff.build_dependency_index({'P1': [{'element': 'r1', 'epd': key, 'quantity': 1.0}]}))
+	rows_csv = os.path.join(str(tmp_path), 'rows.csv')
+	projects_csv = os.path.join(str(tmp_path), 'projects.csv')
+	diff.write_deltas(deltas, rows_csv)
+	diff.write_project_deltas(deltas, projects_csv)
+	for path in (rows_csv, projects_csv):
+		with open(path, encoding='utf-8') as f:
+			lines = f.read().splitlines()
+		assert len(lines) == 2
+		delta = float(lines[1].split(';')[-2].strip('"').replace(',', '.'))
+		assert delta == pytest.approx(5.21e-09)
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pytest
+
+import LCA_tool_structural_takeoff as takeoff
+from conftest import datasets
+
+
+@pytest.fixture(scope='module')
+def index():
+	return takeoff.build_band_index(os.path.join(datasets, 'EC3'))
+
+
+def band_files(index, bands):
+	return [os.path.basename(index['dateien'][b])[len('BuroHappold_EC3_Concrete_'):-len('.json')] if b >= 0 else None for b in bands]
+
+
+def test_band_boundaries_normal_weight(index):
+	strength = [0, 2500, 2500.5, 2501, 3000, 3000.2, 4500, 8000, 8000.5, -1]
+	assert band_files(index, takeoff.lookup_band(index, strength, 'NW')) == [
+		'NW_0-2500', 'NW_0-2500', 'NW_2501-3000', 'NW_2501-3000', 'NW_2501-3000', 'NW_3001-4000', 'NW_4001-5000', 'NW_6001-8000', None, None]
+
+
+def test_band_boundaries_light_weight(index):
+	strength = [2000, 2500, 2500.5, 2501, 4000.5, 5000, 5001]
+	assert band_files(index, takeoff.lookup_band(index, strength, 'LW')) == [
+		None, None, 'LW_2501-3000', 'LW_2501-3000', 'LW_4001-5000', 'LW_4001-5000', None]
+
+
+def test_unknown_weight_class_and_nan(index):
+	bands = takeoff.lookup_band(index, [3500, np.nan, np.nan], ['XX', 'NW', 'LW'])
+	assert bands.tolist() == [-1, -1, -1]
+
+
+def test_mixed_elements_in_one_lookup(index):
+	bands = takeoff.lookup_band(index, np.array([2600, 2600, 7000]), np.array(['NW', 'LW', 'NW']))
+	assert band_files(index, bands) == ['NW_2501-3000', 'LW_2501-3000', 'NW_6001-8000']
+
+
+def test_si_strength(index):
+	assert band_files(index, takeoff.lookup_band(index, [30, 40], 'NW', 'MPa')) == ['NW_4001-5000', 'NW_5001-6000']
+	assert band_files(index, takeoff.lookup_band(index, [30e6], 'NW', 'Pa')) == ['NW_4001-5000']
+	assert takeoff.lookup_band(index, 2500/takeoff.mpa_to_psi, 'NW', 'MPa') == takeoff.lookup_band(index, 2500, 'NW')
+
+
+def test_empty_folder(tmp_path):
+	with pytest.raises(ValueError, match=str(tmp_path.name)):
+		takeoff.build_band_index(str(tmp_path))
+
+
+def test_structural_takeoff_per_element(index):
+	r = takeoff.structural_takeoff(np.array([10.0, 20.0, 30.0]), 2, 4500, index=index)
+	assert r['reinforcement_volume'] == pytest.approx([0.2, 0.4, 0.6])
+	assert r['concrete_volume'] == pytest.approx([9.8, 19.6, 29.4])
+	assert r['glazing_volume'].tolist() == [0, 0, 0]
+	assert r['ec3_band'].shape == (3,)
+
+	r = takeoff.structural_takeoff(10.0, 2, 4500, glazing_area=np.array([5.0, 0.0]), glazing_thickness=0.006, number_of_panes=2, index=index)
+	assert r['glazing_volume'] == pytest.approx([0.06, 0.0])
+	assert r['concrete_volume'].shape == r['ec3_band'].shape == (2,)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from LCA_tool_whole_life import time_horizon
+
+
+def test_grid_import_is_never_negative():
+	r = time_horizon(100.0, 0.0, {'PV': (0.0, 0.0, 25)}, erzeugung_mwh=150.0, betrachtungszeitraum=10, netzfaktor=np.full(10, 0.5),
+		strompreis=250, exportpreis=80, preissteigerung=0, zinssatz=0)
+	assert r['netzbezug_mwh'][0] == 0
+	assert r['export_mwh'][0] == 50
+	assert r['b6_thg_gesamt'][0] == 0		#export is not credited against B6
+	assert r['modul_d_thg_gesamt'][0] == pytest.approx(-50*0.5*10)
+	assert r['npv'][0] == pytest.approx(-50*80*10)		#exported at exportpreis, not strompreis
+
+
+def test_generation_covers_demand_first():
+	r = time_horizon(np.array([100.0, 300.0]), 10.0, {'PV': (0.0, 0.0, 25)}, erzeugung_mwh=150.0, betrachtungszeitraum=1, netzfaktor=[0.4], gasfaktor=0.2)
+	assert r['netzbezug_mwh'].tolist() == [0, 150]
+	assert r['export_mwh'].tolist() == [50, 0]
+	assert r['b6_thg_gesamt'] == pytest.approx([10*0.2, 150*0.4 + 10*0.2])
+
+
+def test_replacements_residual_value_and_discounting():
+	r = time_horizon(0.0, 0.0, {'Batterie': (1000.0, 10.0, 15), 'PV': (2000.0, 20.0, 25)}, betrachtungszeitraum=50, zinssatz=0.03)
+	assert np.nonzero(r['ersatzkosten'][0])[0].tolist() == [14, 24, 29, 44]		#not replaced in the last year
+	assert r['b4_thg_gesamt'][0] == pytest.approx(3*10 + 20)
+	restwert = 1000*(10/15)*1.03**-50		#battery installed in year 45 has 10 of 15 years left, PV (year 25) none
+	assert r['restwert'][0] == pytest.approx(restwert)
+	expected = 3000 + sum(1000*1.03**-t for t in (15, 30, 45)) + 2000*1.03**-25 - restwert
+	assert r['npv'][0] == pytest.approx(expected)
+
+
+def test_one_off_items_are_not_replaced():
+	r = time_horizon(0.0, 0.0, {'Anschluss': (1000.0, 0.0, None), 'Forderung': (-500.0, 0.0, None), 'Trasse': (2000.0, 30.0, 40)}, betrachtungszeitraum=50, zinssatz=0)
+	assert np.nonzero(r['ersatzkosten'][0])[0].tolist() == [39]
+	assert r['b4_thg_gesamt'][0] == 30
+	assert r['restwert'][0] == pytest.approx(2000*30/40)
+	assert r['npv'][0] == pytest.approx(500 + 2000 + 2000 - 2000*30/40)
+
+
+def test_empty_components():
+	r = time_horizon(10.0, 0.0, {}, betrachtungszeitraum=5, netzfaktor=[0.1]*5, zinssatz=0, preissteigerung=0, strompreis=100)
+	assert r['b4_thg_gesamt'][0] == 0
+	assert r['npv'][0] == pytest.approx(5*10*100)
+
+
+def test_interest_and_escalation_per_scenario():
+	r = time_horizon(10.0, 0.0, {'PV': (1000.0, 0.0, 25)}, betrachtungszeitraum=10, strompreis=100,
+		zinssatz=np.array([0.0, 0.05]), preissteigerung=np.array([0.0, 0.02]))
+	assert r['npv'].shape == (2,)
+	assert r['npv'][0] == pytest.approx(1000 + 10*10*100 - 1000*15/25)
+	expected = 1000 + sum(1000*1.02**(t - 1)*1.05**-t for t in range(1, 11)) - 1000*15/25*1.05**-10
+	assert r['npv'][1] == pytest.approx(expected)
+
+
+def test_scenarios_by_years():
+	S = 200
+	r = time_horizon(np.linspace(0, 500, S), np.full(S, 50.0), {'PV': (np.full(S, 1e5), 100.0, 25)}, betrachtungszeitraum=60, netzfaktor=np.full((S, 60), 0.1))
+	assert r['b6_thg'].shape == (S, 60)
+	assert r['npv'].shape == (S,)
+	assert np.all(np.diff(r['b6_thg_gesamt']) > 0)